@@ -14,13 +14,13 @@ Date:   February 2026
 """
 
 import os
-import csv
 import numpy as np
 import matplotlib
 matplotlib.use('Agg')
 import matplotlib.pyplot as plt
-from collections import Counter, defaultdict
-from math import factorial, exp
+from scipy import stats
+
+from sat_common import load_arrays
 
 plt.rcParams.update({
     'font.family': 'serif', 'font.size': 11, 'axes.labelsize': 12,
@@ -32,20 +32,21 @@ DATA = os.path.join(os.path.dirname(__file__), '..', 'data')
 OUT = os.path.join(os.path.dirname(__file__), '..', 'paper', 'figures')
 os.makedirs(OUT, exist_ok=True)
 
+# One reusable canvas for all four figures: allocate the figure and warm the
+# font cache once, then clear and resize it per figure.
+FIG = plt.figure(figsize=(13, 5))
+
+
+def _axes(figsize):
+    FIG.clf()
+    FIG.set_size_inches(*figsize)
+    return FIG.subplots(1, 2)
+
 # Load data
-satellites = []
-with open(os.path.join(DATA, 'satellites_9012.csv')) as f:
-    reader = csv.DictReader(f)
-    for row in reader:
-        satellites.append((int(row['main_star_n']), int(row['gap_k'])))
-
-by_star = defaultdict(list)
-for n, k in satellites:
-    by_star[n].append(k)
-stars = sorted(by_star.keys())
-all_gaps = [k for _, k in satellites]
-sats_per = [len(by_star[n]) for n in stars]
-n_with = len(stars)
+n_col, k_col, star_arr, sats_per, digits, d_arr, ln_P_arr = load_arrays(
+    os.path.join(DATA, 'satellites_9012.csv'))
+all_gaps = k_col
+n_with = len(star_arr)
 
 # Corrected parameters
 N_true = 2107
@@ -56,7 +57,7 @@ lam = 9012 / N_true  # 4.278
 # ── Figure 1: Gap distribution + mod 30 ──
 def figure1():
     from matplotlib.patches import Patch
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(13, 5))
+    ax1, ax2 = _axes((13, 5))
     bins_hist = np.arange(0, 5250, 250)
     ax1.hist(all_gaps, bins=bins_hist, color='#3498db', alpha=0.7,
              edgecolor='#2c3e50', linewidth=0.5, label='Observed')
@@ -67,9 +68,9 @@ def figure1():
     ax1.set_title('(a) Gap distribution (uniform, $p = 0.31$)', fontweight='bold')
     ax1.legend(fontsize=10); ax1.grid(True, alpha=0.15, axis='y')
 
-    mod30 = Counter(k % 30 for k in all_gaps)
+    mod30_counts = np.bincount(k_col % 30, minlength=30)
     admissible = [0, 2, 6, 8, 12, 14, 18, 20, 24, 26]
-    vals = [mod30.get(r, 0) for r in admissible]
+    vals = mod30_counts[admissible]
     colors = ['#e74c3c' if r % 6 == 0 else '#3498db' for r in admissible]
     ax2.bar(range(10), vals, color=colors, alpha=0.8, edgecolor='#333', linewidth=0.5)
     ax2.set_xticks(range(10))
@@ -81,17 +82,20 @@ def figure1():
                 Patch(facecolor='#3498db', alpha=0.8)],
                [r'$k \equiv 0$ (mod 6)', r'$k \equiv 2$ (mod 6)'], fontsize=9)
     ax2.grid(True, alpha=0.15, axis='y')
-    plt.tight_layout()
-    plt.savefig(os.path.join(OUT, 'p3_fig1.png'), dpi=300); plt.close()
+    FIG.tight_layout()
+    FIG.savefig(os.path.join(OUT, 'p3_fig1.png'), dpi=300)
     print("  Figure 1 saved.")
 
 
 # ── Figure 2: CDF + Poisson ──
 def figure2():
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(13, 5.5))
-    min_gaps = sorted([min(by_star[n]) for n in stars])
+    ax1, ax2 = _axes((13, 5.5))
+    order = np.argsort(n_col, kind='stable')
+    k_sorted = k_col[order]
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(n_col[order])) + 1))
+    min_gaps = np.sort(np.minimum.reduceat(k_sorted, starts))
     cdf_obs = np.arange(1, n_with + 1) / n_with
-    ln_P = np.mean([int(46 * np.log10(n) + 1.67) * np.log(10) for n in stars])
+    ln_P = ln_P_arr.mean()
     k_th = np.linspace(2, 5000, 500)
     cdf_cr = 1 - np.exp(-k_th / (3 * ln_P))
     ax1.plot(min_gaps, cdf_obs, '-', color='#3498db', linewidth=2, label='Observed CDF')
@@ -103,7 +107,7 @@ def figure2():
 
     k_range = range(16)
     obs_hist = [N_zero if k == 0 else sum(1 for s in sats_per if s == k) for k in k_range]
-    poi_exp = [N_true * (lam ** k * exp(-lam) / factorial(k)) for k in k_range]
+    poi_exp = N_true * stats.poisson.pmf(np.arange(16), lam)
     x = np.arange(len(k_range)); w = 0.35
     ax2.bar(x - w / 2, obs_hist, w, color='#3498db', alpha=0.8, label='Observed')
     ax2.bar(x + w / 2, poi_exp, w, color='#e74c3c', alpha=0.6,
@@ -112,25 +116,31 @@ def figure2():
                  color='#3498db', fontweight='bold')
     ax2.set_xlabel('Satellites per main star'); ax2.set_ylabel('Number of stars')
     ax2.set_xticks(x); ax2.set_xticklabels(k_range)
-    all_c = [0] * N_zero + sats_per
-    disp = np.var(all_c) / np.mean(all_c)
+    # Dispersion over all N_true stars without materializing the zero padding.
+    mean_all = sats_per.sum() / N_true
+    var_all = (np.square(sats_per).sum() - N_true * mean_all**2) / N_true
+    disp = var_all / mean_all
     ax2.set_title(f'(b) Poisson fit ($N = {N_true}$, disp. = {disp:.2f})', fontweight='bold')
     ax2.legend(fontsize=10); ax2.grid(True, alpha=0.15, axis='y')
-    plt.tight_layout()
-    plt.savefig(os.path.join(OUT, 'p3_fig2.png'), dpi=300); plt.close()
+    FIG.tight_layout()
+    FIG.savefig(os.path.join(OUT, 'p3_fig2.png'), dpi=300)
     print("  Figure 2 saved.")
 
 
 # ── Figure 3: Density vs n ──
 def figure3():
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(13, 5))
-    n_arr = np.array(stars); s_arr = np.array(sats_per)
+    ax1, ax2 = _axes((13, 5))
+    n_arr = star_arr; s_arr = sats_per
     n_bins = np.linspace(50e9, 200e9, 31)
     n_cen = (n_bins[:-1] + n_bins[1:]) / 2
-    means = [np.mean(s_arr[(n_arr >= n_bins[i]) & (n_arr < n_bins[i + 1])])
-             if ((n_arr >= n_bins[i]) & (n_arr < n_bins[i + 1])).sum() > 0 else np.nan
-             for i in range(len(n_bins) - 1)]
-    ax1.scatter(n_arr / 1e9, s_arr, s=3, alpha=0.15, c='#3498db', rasterized=True)
+    # One digitize pass + weighted bincounts instead of a fresh mask per bin.
+    bin_idx = np.digitize(n_arr, n_bins) - 1
+    valid = (bin_idx >= 0) & (bin_idx < n_cen.size)
+    counts = np.bincount(bin_idx[valid], minlength=n_cen.size)
+    sum_s = np.bincount(bin_idx[valid], weights=s_arr[valid], minlength=n_cen.size)
+    means = np.where(counts > 0, sum_s / np.maximum(counts, 1), np.nan)
+    ax1.hexbin(n_arr / 1e9, s_arr, gridsize=(60, 16), cmap='Blues',
+               mincnt=1, bins='log')
     ax1.plot(n_cen / 1e9, means, 'o-', color='#e74c3c', markersize=4, linewidth=1.5,
              label='Binned mean')
     n_th = np.linspace(50e9, 200e9, 200)
@@ -142,12 +152,16 @@ def figure3():
     ax1.legend(fontsize=9); ax1.set_ylim(0, 16); ax1.grid(True, alpha=0.2)
 
     n_bins2 = np.linspace(50e9, 200e9, 13)
+    bin2 = np.digitize(n_arr, n_bins2) - 1
+    valid2 = (bin2 >= 0) & (bin2 < len(n_bins2) - 1)
+    counts2 = np.bincount(bin2[valid2], minlength=len(n_bins2) - 1)
+    sum_s2 = np.bincount(bin2[valid2], weights=s_arr[valid2], minlength=len(n_bins2) - 1)
+    sum_d2 = np.bincount(bin2[valid2], weights=digits[valid2], minlength=len(n_bins2) - 1)
     ratios, cen2 = [], []
     for i in range(len(n_bins2) - 1):
-        mask = (n_arr >= n_bins2[i]) & (n_arr < n_bins2[i + 1])
-        if mask.sum() < 10: continue
-        d_m = np.mean(46 * np.log10(n_arr[mask]) + 1.67)
-        ratios.append(np.mean(s_arr[mask]) / (5000 / (d_m * np.log(10))))
+        if counts2[i] < 10: continue
+        d_m = sum_d2[i] / counts2[i]
+        ratios.append(sum_s2[i] / counts2[i] / (5000 / (d_m * np.log(10))))
         cen2.append((n_bins2[i] + n_bins2[i + 1]) / 2)
     ax2.bar(range(len(ratios)), ratios, color='#9b59b6', alpha=0.7, edgecolor='#333')
     ax2.axhline(y=1.0, color='#e74c3c', linestyle='--', linewidth=1.5, label='Perfect agreement')
@@ -157,19 +171,19 @@ def figure3():
     ax2.set_ylabel("Observed / Cram\\'er")
     ax2.set_title("(b) Ratio by region", fontweight='bold')
     ax2.set_ylim(0.8, 1.3); ax2.legend(fontsize=10); ax2.grid(True, alpha=0.15, axis='y')
-    plt.tight_layout()
-    plt.savefig(os.path.join(OUT, 'p3_fig3.png'), dpi=300); plt.close()
+    FIG.tight_layout()
+    FIG.savefig(os.path.join(OUT, 'p3_fig3.png'), dpi=300)
     print("  Figure 3 saved.")
 
 
 # ── Figure 4: Close encounters + small gaps ──
 def figure4():
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(13, 5))
-    small = [(n, k) for n, k in satellites if k <= 100]
-    ns, ks = zip(*small)
-    ax1.scatter(np.array(ns) / 1e9, ks, c='gold', s=60, edgecolors='darkorange',
+    ax1, ax2 = _axes((13, 5))
+    small = k_col <= 100
+    ns, ks = n_col[small], k_col[small]
+    ax1.scatter(ns / 1e9, ks, c='gold', s=60, edgecolors='darkorange',
                 linewidths=0.8, zorder=5, marker='*')
-    for n, k in small:
+    for n, k in zip(ns, ks):
         if k <= 20:
             ax1.annotate(f'k={k}', xy=(n / 1e9, k), fontsize=7,
                          xytext=(3, 3), textcoords='offset points')
@@ -179,9 +193,9 @@ def figure4():
     ax1.text(55, 8, '$k=6$ (sexy primes)', fontsize=8, color='red')
     ax1.set_xlim(50, 205); ax1.grid(True, alpha=0.2)
 
-    gap_counts = Counter(all_gaps)
+    gap_hist = np.bincount(k_col, minlength=62)
     k_adm = [k for k in range(2, 62, 2) if k % 3 != 1]
-    obs_c = [gap_counts.get(k, 0) for k in k_adm]
+    obs_c = gap_hist[k_adm]
     ax2.bar(range(len(k_adm)), obs_c, color='#3498db', alpha=0.8, edgecolor='#333',
             linewidth=0.5)
     ax2.set_xticks(range(len(k_adm)))
@@ -190,8 +204,8 @@ def figure4():
     ax2.set_title('(b) Fine-grained small-gap census ($k < 62$)', fontweight='bold')
     ax2.axhline(y=len(all_gaps) / 1667, color='grey', linestyle=':', alpha=0.5)
     ax2.grid(True, alpha=0.15, axis='y')
-    plt.tight_layout()
-    plt.savefig(os.path.join(OUT, 'p3_fig4.png'), dpi=300); plt.close()
+    FIG.tight_layout()
+    FIG.savefig(os.path.join(OUT, 'p3_fig4.png'), dpi=300)
     print("  Figure 4 saved.")
 
 
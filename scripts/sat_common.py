@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+sat_common.py — Shared catalog loading for the Paper IV scripts.
+
+Loads the satellite catalog into int64 arrays and derives the per-star
+digit count of P = n^47 - (n-1)^47 once, caching the log10 pass to a
+.npy file next to the CSV (keyed by the CSV's mtime).
+
+Author: Ruqing Chen, GUT Geoservice Inc.
+Date:   August 2026
+"""
+
+import os
+import numpy as np
+import pandas as pd
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
+DEFAULT_CATALOG = os.path.join(DATA_DIR, 'satellites_9012.csv')
+
+
+def _star_digits(stars, path):
+    """Digit count 46*log10(n) + 1.67 per star, cached alongside the CSV."""
+    cache = os.path.splitext(path)[0] + '_digits.npy'
+    if (os.path.exists(cache)
+            and os.path.getmtime(cache) >= os.path.getmtime(path)):
+        digits = np.load(cache)
+        if digits.size == stars.size:
+            return digits
+    digits = 46.0 * np.log10(stars) + 1.67
+    try:
+        np.save(cache, digits)
+    except OSError:
+        pass  # read-only data dir: skip the cache
+    return digits
+
+
+def load_arrays(path=DEFAULT_CATALOG):
+    """Load the catalog, returning
+    (n_col, k_col, stars, sats_per, digits, d_arr, ln_P_arr).
+
+    n_col and k_col are the raw catalog columns; stars the sorted unique
+    main stars and sats_per their satellite counts; digits the per-star
+    digit count of P (float); d_arr its integer truncation;
+    ln_P_arr = d_arr * ln(10).
+    """
+    df = pd.read_csv(path, usecols=['main_star_n', 'gap_k'],
+                     dtype={'main_star_n': np.int64, 'gap_k': np.int64})
+    n_col = df['main_star_n'].to_numpy()
+    k_col = df['gap_k'].to_numpy()
+    stars, sats_per = np.unique(n_col, return_counts=True)
+    digits = _star_digits(stars, path)
+    d_arr = digits.astype(np.int64)
+    return n_col, k_col, stars, sats_per, digits, d_arr, d_arr * np.log(10)
@@ -2,6 +2,9 @@ import time
 import os
 import re
 import glob
+import multiprocessing
+
+import numpy as np
 
 try:
     import gmpy2
@@ -13,10 +16,85 @@ except ImportError:
 Q = 47
 # 扫描主星左侧多远的距离？(步长为2的偶数，建议 5000)
 SEARCH_RADIUS = 5000
+# 小素数预筛上限：先试除掉 10^6 以下的素因子，幸存者才进 BPSW
+SIEVE_LIMIT = 10**6
+# 日志里的主星记录：字节模式逐行匹配，省掉整文件读入和 Unicode 解码
+_LOG_PAT = re.compile(rb'(?:Sequence|QUADRUPLET):\s*(\d+)')
+
+def primes_up_to(limit):
+    sieve = np.ones(limit + 1, dtype=bool)
+    sieve[:2] = False
+    for i in range(2, int(limit**0.5) + 1):
+        if sieve[i]:
+            sieve[i*i::i] = False
+    return np.flatnonzero(sieve).astype(np.int64)
+
+SMALL_PRIMES = primes_up_to(SIEVE_LIMIT)
+# 不超过扫描半径的素数可能击中多个 k；更大的素数至多击中一个
+_N_NEAR = int(np.searchsorted(SMALL_PRIMES, SEARCH_RADIUS, side='right'))
+
+# 【泰坦护盾过滤器】wheel-6 候选间距：偶数且剔除必定被 3 整除的死区
+K_WHEEL = np.arange(2, SEARCH_RADIUS + 1, 2)
+K_WHEEL = K_WHEEL[K_WHEEL % 3 != 1]
+
+def _q47_coeffs():
+    """展开 n^47 - (n-1)^47 的多项式系数（46 次，最高次在前）。
+    最大系数 C(47,23) ≈ 1.6e13，全部装得进 int64。"""
+    from math import comb
+    coeffs = [comb(Q, j) * (-1)**(Q - 1 - j) for j in range(Q - 1, -1, -1)]
+    return np.array(coeffs, dtype=np.int64)
+
+_Q47_COEFFS = _q47_coeffs()
 
 def q47(n):
+    # 全程 mpz 运算：P - k 留在 mpz 空间，is_prime 不再做 int -> mpz 转换
+    if HAS_GMPY2:
+        mn = gmpy2.mpz(n)
+        return mn**Q - (mn - 1)**Q
     return n**Q - (n-1)**Q
 
+def quad_residues(base_n):
+    """对 4连星 的 4 个偏移，用 Horner 法按模求多项式值，一口气得到全部
+    P mod p 残差表 —— 整个预筛不再碰任何大数除法。"""
+    res = []
+    for off in range(4):
+        n0 = (base_n + off) % SMALL_PRIMES
+        r = np.zeros(SMALL_PRIMES.size, dtype=np.int64)
+        for c in _Q47_COEFFS:
+            r = (r * n0 + c) % SMALL_PRIMES
+        res.append(r)
+    return res
+
+def sieve_survivors(r_all, ks):
+    """【泰坦预筛阵列】根据残差表 r_all = P mod p 剔除所有 P - k 含
+    小素因子的 k，只放行真正可疑的候选者。"""
+    alive = np.ones(ks.size, dtype=bool)
+    for p, r in zip(SMALL_PRIMES[:_N_NEAR], r_all[:_N_NEAR]):
+        alive &= (r - ks) % p != 0
+    # p > SEARCH_RADIUS 时，p | P - k 当且仅当 k == P mod p
+    far = r_all[_N_NEAR:]
+    for r in far[(far >= ks[0]) & (far <= ks[-1])]:
+        idx = int(np.searchsorted(ks, r))
+        if idx < ks.size and ks[idx] == r:
+            alive[idx] = False
+    return ks[alive]
+
+def scan_star(base_n):
+    """扫描一组 4连星 的全部 4 颗主星，返回发现的 (n, k) 列表。"""
+    found = []
+    # 每组 4连星 的 4 个 P 值和残差表一次算好，内层循环不再做大数运算
+    P_list = [q47(base_n + off) for off in range(4)]
+    res_list = quad_residues(base_n)
+    for offset, (P, r_all) in enumerate(zip(P_list, res_list)): # 遍历 4连星 的每一颗主星
+        n = base_n + offset
+        # 向左侧撒网：只对通过小素数预筛的幸存者做 BPSW
+        for k in map(int, sieve_survivors(r_all, K_WHEEL)):
+            candidate = P - k
+            # 极速素性测试
+            if HAS_GMPY2 and gmpy2.is_prime(candidate, 25):
+                found.append((n, k))
+    return found
+
 def main():
     print("==================================================")
     print("📡 泰坦深空伴星雷达 v3.0 (终极全星表阵列)")
@@ -30,11 +108,10 @@ def main():
     
     for filename in all_files:
         try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                content = f.read()
-                matches = re.findall(r'(?:Sequence|QUADRUPLET):\s*(\d+)', content)
-                for m in matches:
-                    n_values.add(int(m))
+            with open(filename, 'rb') as f:
+                for line in f:
+                    for m in _LOG_PAT.finditer(line):
+                        n_values.add(int(m.group(1)))
         except Exception as e:
             pass
 
@@ -67,32 +144,25 @@ def main():
     total_satellites = 0
     twin_primes = 0
 
-    # 3. 开始雷达扫描
+    # 3. 开始雷达扫描：每组基站互相独立，全核并行
     start_time = time.time()
-    
-    for base_n in sorted_n:
-        for offset in range(4): # 遍历 4连星 的每一颗主星
-            n = base_n + offset
-            P = q47(n)
-            
-            # 向左侧撒网
-            for k in range(2, SEARCH_RADIUS + 1, 2):
-                # 【泰坦护盾过滤器】：直接跳过必定被 3 整除的死区
-                if k % 3 == 1:
-                    continue
-                
-                candidate = P - k
-                
-                # 极速素性测试
-                if HAS_GMPY2 and gmpy2.is_prime(candidate, 25):
-                    total_satellites += 1
-                    if k == 2:
-                        twin_primes += 1
-                        print(f"🚨🚨 [世纪发现！] 捕获纯血孪生素数！主星 n = {n}, 伴星 = P - 2")
-                    else:
-                        print(f"🛰️  发现伴星！主星 n = {n}, 伴星间距 = P - {k}")
-                        
+
+    # 发现先缓冲成字符串，最后一次性输出，热循环里不碰终端 I/O
+    findings = []
+    with multiprocessing.Pool(os.cpu_count()) as pool:
+        for found in pool.imap(scan_star, sorted_n):
+            for n, k in found:
+                total_satellites += 1
+                if k == 2:
+                    twin_primes += 1
+                    findings.append(f"🚨🚨 [世纪发现！] 捕获纯血孪生素数！主星 n = {n}, 伴星 = P - 2")
+                else:
+                    findings.append(f"🛰️  发现伴星！主星 n = {n}, 伴星间距 = P - {k}")
+
     end_time = time.time()
+
+    if findings:
+        print("\n".join(findings))
     
     print("==================================================")
     print(f"🏁 雷达扫描完毕！耗时: {end_time - start_time:.2f} 秒")